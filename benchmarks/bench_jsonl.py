@@ -0,0 +1,70 @@
+"""
+Serialization benchmark for AugmentedPostalCode / write_jsonl.
+
+Reports records/sec and bytes/record for each --raw level and JSON backend.
+
+    python benchmarks/bench_jsonl.py --records 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from postal_code_id_ingester.export.jsonl import write_jsonl, orjson
+from postal_code_id_ingester.model.augmented import (
+    AugmentedPostalCode,
+    RAW_LEVELS,
+)
+
+
+def make_records(n: int, raw_level: str) -> list[AugmentedPostalCode]:
+    records = []
+    for i in range(n):
+        candidate = {
+            "postal_code": f"{40000 + i % 9999:05d}",
+            "village": f"Sukamaju {i % 500}",
+            "district": f"Cibeunying Kaler {i % 80}",
+            "city": "Kota Bandung",
+            "province": "Jawa Barat",
+        }
+        records.append(
+            AugmentedPostalCode(
+                village_code=f"{3273051001 + i}",
+                postal_code=candidate["postal_code"],
+                source="pos-indonesia",
+                confidence=0.912,
+                raw=AugmentedPostalCode.compact_raw(candidate, raw_level),
+            )
+        )
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+
+    backends = ["json"] + (["orjson"] if orjson is not None else [])
+
+    print(f"{'raw':<8} {'backend':<8} {'rec/s':>12} {'bytes/rec':>10}")
+    for raw_level in RAW_LEVELS:
+        records = make_records(args.records, raw_level)
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as tmp:
+                out = os.path.join(tmp, "out.jsonl")
+
+                t0 = time.perf_counter()
+                write_jsonl(out, records, json_backend=backend)
+                elapsed = time.perf_counter() - t0
+
+                size = os.path.getsize(out)
+
+            print(
+                f"{raw_level:<8} {backend:<8} "
+                f"{args.records / elapsed:>12,.0f} "
+                f"{size / args.records:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Keyword ladder micro-benchmark over a region-id CSV.
+
+Compares building every village's ladder with the uncached functions
+(what process_village used to do per village) against the cached
+keyword engine, cold and warm.
+
+    python benchmarks/bench_keywords.py --regions regions_id.csv
+"""
+import argparse
+import re
+import time
+
+from postal_code_id_ingester.ingest.region_id_loader import (
+    load_villages_from_region_id,
+)
+from postal_code_id_ingester.query import keywords
+from postal_code_id_ingester.query.keywords import (
+    build_keyword_ladders,
+    clear_keyword_cache,
+)
+
+
+def uncached_ladders(villages):
+    # the pre-engine implementation: uncompiled re.sub per call
+    def single(name):
+        cleaned = re.sub(r"[^a-zA-Z\s]", " ", name.lower())
+        tokens = [t for t in cleaned.split() if t not in keywords.STOPWORDS]
+        return max(tokens, key=len) if tokens else ""
+
+    def city(name):
+        cleaned = re.sub(r"[^a-zA-Z\s]", " ", name.lower())
+        parts = [p for p in cleaned.split() if p not in keywords.CITY_PREFIXES]
+        return " ".join(parts).title()
+
+    def prefixes(name):
+        tokens = re.sub(r"[^a-zA-Z\s]", " ", name).split()
+        if len(tokens) < 2:
+            return []
+        return [" ".join(tokens[:i]) for i in range(2, min(len(tokens), 4) + 1)]
+
+    out = []
+    for v in villages:
+        city_keyword = city(v.city)
+        raw = [v.village, v.district]
+        raw.extend(prefixes(v.village))
+        raw.extend(prefixes(v.district))
+        raw.append(single(v.village))
+        raw.append(city_keyword)
+
+        seen = set()
+        kws = []
+        for k in raw:
+            if not k:
+                continue
+            k = k.strip()
+            if len(k) < keywords.MIN_KEYWORD_LENGTH:
+                continue
+            if k.lower() in seen:
+                continue
+            seen.add(k.lower())
+            kws.append(k)
+        out.append((tuple(kws), city_keyword))
+    return out
+
+
+def timed(label, fn, villages):
+    t0 = time.perf_counter()
+    result = fn(villages)
+    elapsed = time.perf_counter() - t0
+    print(
+        f"{label:<10} {elapsed * 1000:>10.1f} ms "
+        f"{len(villages) / elapsed:>12,.0f} villages/s"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--regions", required=True, help="regions_id.csv path")
+    args = parser.parse_args()
+
+    villages = load_villages_from_region_id(args.regions)
+    print(f"{len(villages)} villages")
+
+    clear_keyword_cache()
+    baseline = timed("uncached", uncached_ladders, villages)
+
+    clear_keyword_cache()
+    cold = timed("cold", build_keyword_ladders, villages)
+    timed("warm", build_keyword_ladders, villages)
+
+    assert [tuple(x) for x in cold] == [(k, c) for k, c in baseline]
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import argparse
 import asyncio
+import sqlite3
 
 from postal_code_id_ingester.ingest.region_id_loader import (
     load_villages_from_region_id
@@ -8,22 +9,96 @@ from postal_code_id_ingester.ingest.region_id_loader import (
 from postal_code_id_ingester.ingest.failed_loader import (
     load_failed_villages
 )
-from postal_code_id_ingester.ingest.fetcher import fetch_postal_html
-from postal_code_id_ingester.sources.pos_indonesia import parse_postal_results
-from postal_code_id_ingester.matchers.region_matcher import (
-    match_postal_candidate,
-    match_postal_candidate_override
+from postal_code_id_ingester.ingest.fetcher import fetch_postal_html, FetchError
+from postal_code_id_ingester.matchers.cpu_stage import (
+    CpuStage,
+    MatchRequest,
+    MatchResult,
+    EXECUTOR_KINDS,
 )
-from postal_code_id_ingester.model.augmented import AugmentedPostalCode
-from postal_code_id_ingester.export.jsonl import write_jsonl
-from postal_code_id_ingester.export.resume import load_seen_village_codes
-from postal_code_id_ingester.query.keywords import (
-    extract_single_word,
-    extract_prefix_keywords,
-    normalize_city_name,
+from postal_code_id_ingester.model.augmented import (
+    AugmentedPostalCode,
+    RAW_LEVELS,
 )
+from postal_code_id_ingester.export.jsonl import (
+    write_jsonl,
+    get_json_encoder,
+    JSON_BACKENDS,
+)
+from postal_code_id_ingester.export.compact import (
+    compact_jsonl,
+    COMPACT_POLICIES,
+)
+from postal_code_id_ingester.export.resume import (
+    load_seen_village_codes,
+    load_resolved_postal_codes,
+)
+from postal_code_id_ingester.matchers.sibling_matcher import (
+    infer_from_siblings,
+    SIBLING_SOURCE,
+)
+from postal_code_id_ingester.query.keywords import build_keyword_ladder
 from postal_code_id_ingester.ingest.override_loader import load_override_rules
+from postal_code_id_ingester.ingest.candidate_cache import CandidateCache
+from postal_code_id_ingester.diagnostics.profiler import (
+    NULL_PROFILER,
+    RunProfiler,
+)
 
+INLINE_CPU_STAGE = CpuStage(0)
+
+
+async def search_and_match(
+    keyword: str,
+    request: MatchRequest,
+    cpu_stage: CpuStage,
+    cache: CandidateCache | None,
+    profiler,
+) -> tuple[MatchResult, str | None]:
+    """
+    Fetch + parse + score a keyword, serving parsed rows from the
+    candidate cache when available. Fetch failures are raised as
+    FetchError; CPU stage errors propagate unchanged.
+
+    Also returns when a cached result was originally retrieved
+    (None for a fresh fetch, stamped at write time).
+
+    Cache failures (e.g. a file locked by another shard) never cost a
+    result: a failed get falls back to the network, a failed put just
+    isn't cached.
+    """
+    cached = None
+    if cache:
+        try:
+            cached = await cache.get(keyword)
+        except sqlite3.Error as e:
+            print(f"CACHE ERROR get keyword={keyword}: {e}")
+
+    if cached is not None:
+        candidates, created_at = cached
+        [result] = await cpu_stage.match(candidates, [request], profiler)
+        return result, AugmentedPostalCode.iso_from_timestamp(created_at)
+
+    try:
+        with profiler.stage("fetch_postal_html"):
+            html = await fetch_postal_html(keyword)
+    except Exception as e:
+        raise FetchError(f"{keyword}: {e}") from e
+
+    candidates, [result] = await cpu_stage.parse_and_match(
+        html,
+        [request],
+        profiler,
+    )
+
+    # only cache real result pages; ban / error pages have no table
+    if cache and candidates is not None:
+        try:
+            await cache.put(keyword, candidates)
+        except sqlite3.Error as e:
+            print(f"CACHE ERROR put keyword={keyword}: {e}")
+
+    return result, None
 
 
 async def process_village(
@@ -32,48 +107,32 @@ async def process_village(
     override_rules: dict,
     enable_overrides: bool,
     verbose: bool = False,
+    raw_level: str = "full",
+    profiler=NULL_PROFILER,
+    phase: str = "all",
+    cpu_stage: CpuStage | None = None,
+    cache: CandidateCache | None = None,
 ):
+    """
+    Resolve a single village.
+
+    phase:
+    - all: every keyword, then overrides (default)
+    - primary: skip the city-level keyword and overrides
+    - last_resort: ONLY the city-level keyword and overrides
+    """
+    cpu_stage = cpu_stage or INLINE_CPU_STAGE
+
     async with sem:
         if verbose:
             print(f"PROCESS {v.village} ({v.village_code})")
 
-        # Keyword strategy (ORDER MATTERS)
-        raw_keywords = [
-            v.village,                     # 1. default (as-is)
-            v.district,                    # 2. fallback district
-        ]
-
-        # 3. progressive village prefix
-        raw_keywords.extend(extract_prefix_keywords(v.village))
-
-        # 4. progressive district prefix (optional, safer belakangan)
-        raw_keywords.extend(extract_prefix_keywords(v.district))
+        keywords, city_keyword = build_keyword_ladder(v)
 
-        # 5. single word LAST fallback
-        raw_keywords.append(extract_single_word(v.village))
-
-        # 6) city-level LAST RESORT
-        city_keyword = normalize_city_name(v.city)
-        if city_keyword:
-            raw_keywords.append(city_keyword)
-
-        # ---- normalize & dedup ----
-        seen = set()
-        keywords = []
-        for k in raw_keywords:
-            if not k:
-                continue
-
-            k = k.strip()
-            if len(k) < 3:
-                continue
-
-            key = k.lower()
-            if key in seen:
-                continue
-
-            seen.add(key)
-            keywords.append(k)
+        if phase == "primary":
+            keywords = [k for k in keywords if k != city_keyword]
+        elif phase == "last_resort":
+            keywords = [k for k in keywords if k == city_keyword]
 
         if verbose:
             print(f"  KEYWORDS ({len(keywords)}): {keywords}")
@@ -82,40 +141,36 @@ async def process_village(
             is_city_level = (keyword == city_keyword)
 
             try:
-                html = await fetch_postal_html(keyword)
-            except Exception as e:
+                (c, score), retrieved_at = await search_and_match(
+                    keyword,
+                    MatchRequest(v, mode="city" if is_city_level else "village"),
+                    cpu_stage,
+                    cache,
+                    profiler,
+                )
+            except FetchError as e:
                 if verbose:
-                    print(f"    FETCH ERROR keyword={keyword}: {e}")
-                continue
-
-            candidates = parse_postal_results(html)
-            if not candidates:
+                    print(f"    FETCH ERROR keyword={keyword}: {e.__cause__}")
                 continue
 
-            for c in candidates:
-                score = match_postal_candidate(
-                    v, 
-                    c,
-                    mode="city" if is_city_level else "village",
-                )
-                if score:
-                    if verbose:
-                        print(
-                            f"    MATCH keyword='{keyword}' "
-                            f"postal_code={c['postal_code']} "
-                            f"score={score}"
-                        )
-                    return AugmentedPostalCode(
-                        village_code=v.village_code,
-                        postal_code=c["postal_code"],
-                        source="pos-indonesia",
-                        confidence=score,
-                        retrieved_at=AugmentedPostalCode.now_iso(),
-                        raw=c,
+            if score:
+                if verbose:
+                    print(
+                        f"    MATCH keyword='{keyword}' "
+                        f"postal_code={c['postal_code']} "
+                        f"score={score}"
                     )
+                return AugmentedPostalCode(
+                    village_code=v.village_code,
+                    postal_code=c["postal_code"],
+                    source="pos-indonesia",
+                    confidence=score,
+                    retrieved_at=retrieved_at,
+                    raw=AugmentedPostalCode.compact_raw(c, raw_level),
+                )
 
         # ---------- PHASE 2: OVERRIDE (LAST RESORT) ----------
-        if enable_overrides:
+        if enable_overrides and phase != "primary":
             if verbose:
                 print(f"  OVERRIDE HIT for {v.village_code}")
 
@@ -136,36 +191,38 @@ async def process_village(
                     )
 
                 try:
-                    html = await fetch_postal_html(rule.postal_alias)
-                except Exception as e:
+                    (c, score), retrieved_at = await search_and_match(
+                        rule.postal_alias,
+                        MatchRequest(
+                            v,
+                            mode=rule.match_mode,
+                            postal_alias=rule.postal_alias,
+                            override=True,
+                        ),
+                        cpu_stage,
+                        cache,
+                        profiler,
+                    )
+                except FetchError as e:
                     if verbose:
-                        print(f"    OVERRIDE FETCH ERROR: {e}")
+                        print(f"    OVERRIDE FETCH ERROR: {e.__cause__}")
                     return None
 
-                candidates = parse_postal_results(html)
-
-                for c in candidates:
-                    score = match_postal_candidate_override(
-                        v,
-                        c,
-                        mode=rule.match_mode,
-                        postal_alias=rule.postal_alias,
-                    )
-                    if score:
-                        if verbose:
-                            print(
-                                f"    OVERRIDE MATCH "
-                                f"postal_code={c['postal_code']} "
-                                f"score={score}"
-                            )
-                        return AugmentedPostalCode(
-                            village_code=v.village_code,
-                            postal_code=c["postal_code"],
-                            source="pos-indonesia-override",
-                            confidence=score,
-                            retrieved_at=AugmentedPostalCode.now_iso(),
-                            raw=c,
+                if score:
+                    if verbose:
+                        print(
+                            f"    OVERRIDE MATCH "
+                            f"postal_code={c['postal_code']} "
+                            f"score={score}"
                         )
+                    return AugmentedPostalCode(
+                        village_code=v.village_code,
+                        postal_code=c["postal_code"],
+                        source="pos-indonesia-override",
+                        confidence=score,
+                        retrieved_at=retrieved_at,
+                        raw=AugmentedPostalCode.compact_raw(c, raw_level),
+                    )
 
         if verbose:
             print(f"  NO MATCH {v.village}")
@@ -181,6 +238,89 @@ async def run_ingestion(
     limit: int | None = None,
     verbose: bool = False,
     concurrency: int = 3,
+    raw_level: str = "full",
+    json_backend: str = "auto",
+    sibling_inference: bool = False,
+    sibling_min: int = 2,
+    sibling_confidence: float = 0.5,
+    cpu_workers: int = 0,
+    cpu_executor: str = "process",
+    cache_path: str | None = None,
+    cache_ttl_hours: float = 168.0,
+    cache_max_mb: float = 512.0,
+    profile_dir: str | None = None,
+    profile_slow_ms: float = 100.0,
+    profile_mem_interval: float = 5.0,
+):
+    # fail before any network work if the requested encoder is missing
+    get_json_encoder(json_backend)
+
+    profiler = (
+        RunProfiler(
+            profile_dir,
+            slow_ms=profile_slow_ms,
+            mem_interval=profile_mem_interval,
+        )
+        if profile_dir
+        else NULL_PROFILER
+    )
+    cpu_stage = CpuStage(cpu_workers, cpu_executor)
+    cache = (
+        CandidateCache(
+            cache_path,
+            ttl=cache_ttl_hours * 3600,
+            max_bytes=int(cache_max_mb * 1024 * 1024),
+        )
+        if cache_path
+        else None
+    )
+    profiler.start()
+
+    try:
+        await _run_ingestion(
+            regions_path=regions_path,
+            output_path=output_path,
+            override_path=override_path,
+            enable_overrides=enable_overrides,
+            limit=limit,
+            verbose=verbose,
+            concurrency=concurrency,
+            raw_level=raw_level,
+            json_backend=json_backend,
+            sibling_inference=sibling_inference,
+            sibling_min=sibling_min,
+            sibling_confidence=sibling_confidence,
+            cpu_stage=cpu_stage,
+            cache=cache,
+            profiler=profiler,
+        )
+    finally:
+        cpu_stage.shutdown()
+        if cache:
+            if verbose:
+                print(f"CACHE hits={cache.hits} misses={cache.misses}")
+            await cache.close()
+        await profiler.stop()
+        if profile_dir:
+            print(f"Profile written → {profile_dir}")
+
+
+async def _run_ingestion(
+    regions_path: str,
+    output_path: str,
+    override_path: str | None,
+    enable_overrides: bool,
+    limit: int | None,
+    verbose: bool,
+    concurrency: int,
+    raw_level: str,
+    json_backend: str,
+    sibling_inference: bool,
+    sibling_min: int,
+    sibling_confidence: float,
+    cpu_stage: CpuStage,
+    cache: CandidateCache | None,
+    profiler,
 ):
     if regions_path.endswith("failed_regions.csv"):
         villages = load_failed_villages(regions_path)
@@ -210,32 +350,106 @@ async def run_ingestion(
         if verbose:
             print(f"OVERRIDES loaded: {len(override_rules)} rules")
 
-    tasks = []
+    pending = []
     for v in villages:
         if v.village_code in seen_village_codes:
             if verbose:
                 print(f"SKIP (resume) {v.village} ({v.village_code})")
             continue
+        pending.append(v)
+
+    # with sibling inference, city-level fetches and overrides are
+    # deferred until siblings had a chance to resolve the village
+    first_phase = "primary" if sibling_inference else "all"
+
+    results = await asyncio.gather(*[
+        process_village(
+            sem,
+            v,
+            override_rules,
+            enable_overrides,
+            verbose,
+            raw_level,
+            profiler,
+            first_phase,
+            cpu_stage,
+            cache,
+        )
+        for v in pending
+    ])
 
-        tasks.append(
+    records: list[AugmentedPostalCode] = []
+    for r in results:
+        if r and r.village_code not in seen_village_codes:
+            records.append(r)
+            seen_village_codes.add(r.village_code)
+
+    if sibling_inference:
+        # ---------- SIBLING INFERENCE (OFFLINE) ----------
+        # siblings come from the whole existing output, also in
+        # failed-only mode where `villages` is just the failed subset
+        resolved = load_resolved_postal_codes(
+            output_path,
+            exclude_sources={SIBLING_SOURCE},
+        )
+        resolved.update({r.village_code: r.postal_code for r in records})
+
+        unresolved = [
+            v for v in pending if v.village_code not in seen_village_codes
+        ]
+
+        # curated village-level overrides take precedence over guesses
+        inferable = [
+            v for v in unresolved
+            if not (
+                enable_overrides
+                and ("village", v.village_code) in override_rules
+            )
+        ]
+        inferred = infer_from_siblings(
+            inferable,
+            resolved,
+            min_siblings=sibling_min,
+            confidence=sibling_confidence,
+            raw_level=raw_level,
+        )
+        for r in inferred:
+            records.append(r)
+            seen_village_codes.add(r.village_code)
+
+        leftovers = [
+            v for v in unresolved if v.village_code not in seen_village_codes
+        ]
+
+        if verbose:
+            print(
+                f"SIBLING inferred {len(inferred)}, "
+                f"{len(leftovers)} left for city-level / override"
+            )
+
+        results = await asyncio.gather(*[
             process_village(
                 sem,
                 v,
                 override_rules,
                 enable_overrides,
                 verbose,
+                raw_level,
+                profiler,
+                "last_resort",
+                cpu_stage,
+                cache,
             )
-        )
-
-    results = await asyncio.gather(*tasks)
+            for v in leftovers
+        ])
 
-    records: list[AugmentedPostalCode] = []
-    for r in results:
-        if r and r.village_code not in seen_village_codes:
-            records.append(r)
-            seen_village_codes.add(r.village_code)
+        for r in results:
+            if r and r.village_code not in seen_village_codes:
+                records.append(r)
+                seen_village_codes.add(r.village_code)
 
-    write_jsonl(output_path, records)
+    with profiler.stage("write_jsonl"):
+        write_jsonl(output_path, records, json_backend=json_backend)
     print(f"Done. Emitted {len(records)} records → {output_path}")
 
 
@@ -268,7 +482,117 @@ def main():
         "--override-table",
         help="CSV file containing postal override rules",
     )
+    run.add_argument(
+        "--raw",
+        choices=RAW_LEVELS,
+        default="full",
+        help="How much of the matched candidate to keep in `raw` (default: full)",
+    )
+    run.add_argument(
+        "--json-backend",
+        choices=JSON_BACKENDS,
+        default="auto",
+        help="JSON encoder for output (default: auto, orjson if installed)",
+    )
+    run.add_argument(
+        "--sibling-inference",
+        action="store_true",
+        help=(
+            "Infer postal codes for unmatched villages from resolved "
+            "siblings in the same district before city-level fallback"
+        ),
+    )
+    run.add_argument(
+        "--sibling-min",
+        type=int,
+        default=2,
+        help="Min resolved siblings required for inference (default: 2)",
+    )
+    run.add_argument(
+        "--sibling-confidence",
+        type=float,
+        default=0.5,
+        help="Confidence assigned to inferred records (default: 0.5)",
+    )
+    run.add_argument(
+        "--cpu-workers",
+        type=int,
+        default=0,
+        help=(
+            "Parse and score results in a worker pool of this size "
+            "(default: 0, inline on the event loop)"
+        ),
+    )
+    run.add_argument(
+        "--cpu-executor",
+        choices=EXECUTOR_KINDS,
+        default="process",
+        help="Worker pool type for --cpu-workers (default: process)",
+    )
+    run.add_argument(
+        "--cache",
+        metavar="PATH",
+        help="SQLite file caching parsed search results across runs",
+    )
+    run.add_argument(
+        "--cache-ttl-hours",
+        type=float,
+        default=168.0,
+        help="Ignore cached results older than this (default: 168)",
+    )
+    run.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=512.0,
+        help="Evict least recently used results above this size (default: 512)",
+    )
+    run.add_argument(
+        "--profile",
+        metavar="DIR",
+        help=(
+            "Write cProfile, tracemalloc and slow-callback reports to DIR "
+            "(enables asyncio debug mode, which slows the loop and skews "
+            "run.pstats timings)"
+        ),
+    )
+    run.add_argument(
+        "--profile-slow-ms",
+        type=float,
+        default=100.0,
+        help="Report loop blocks longer than this many ms (default: 100)",
+    )
+    run.add_argument(
+        "--profile-mem-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between tracemalloc snapshots (default: 5)",
+    )
 
+    compact = subparsers.add_parser(
+        "compact",
+        help="Merge JSONL outputs into one record per village",
+    )
+    compact.add_argument("inputs", nargs="+", help="Input JSONL files")
+    compact.add_argument(
+        "--output",
+        help="Output JSONL file (default: first input, replaced in place)",
+    )
+    compact.add_argument(
+        "--policy",
+        choices=COMPACT_POLICIES,
+        default="confidence",
+        help="Which record to keep per village (default: confidence)",
+    )
+    compact.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100_000,
+        help="Max records held in memory per sort run (default: 100000)",
+    )
+    compact.add_argument(
+        "--tmp-dir",
+        help="Directory for temporary sort runs (default: system temp)",
+    )
 
     args = parser.parse_args()
 
@@ -282,9 +606,33 @@ def main():
                 limit=args.limit,
                 verbose=args.verbose,
                 concurrency=args.concurrency,
+                raw_level=args.raw,
+                json_backend=args.json_backend,
+                sibling_inference=args.sibling_inference,
+                sibling_min=args.sibling_min,
+                sibling_confidence=args.sibling_confidence,
+                cpu_workers=args.cpu_workers,
+                cpu_executor=args.cpu_executor,
+                cache_path=args.cache,
+                cache_ttl_hours=args.cache_ttl_hours,
+                cache_max_mb=args.cache_max_mb,
+                profile_dir=args.profile,
+                profile_slow_ms=args.profile_slow_ms,
+                profile_mem_interval=args.profile_mem_interval,
             )
         )
 
+    elif args.command == "compact":
+        output = args.output or args.inputs[0]
+        read, written = compact_jsonl(
+            args.inputs,
+            output,
+            policy=args.policy,
+            chunk_size=args.chunk_size,
+            tmp_dir=args.tmp_dir,
+        )
+        print(f"Done. Compacted {read} records into {written} → {output}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,285 @@
+import asyncio
+import asyncio.format_helpers
+import cProfile
+import io
+import linecache
+import logging
+import pstats
+import re
+import time
+import traceback
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+
+STAGES = (
+    "fetch_postal_html",
+    "parse_postal_results",
+    "region_matcher",
+    "cpu_worker",  # parse + match offloaded via --cpu-workers
+    "write_jsonl",
+)
+
+# stages that run synchronously on the event loop thread
+# (any time spent in them is time the loop is blocked)
+BLOCKING_STAGES = {
+    "parse_postal_results",
+    "region_matcher",
+    "write_jsonl",
+}
+
+
+class NullProfiler:
+    """
+    No-op profiler used when --profile is off.
+    """
+
+    enabled = False
+    _noop = nullcontext()
+
+    def stage(self, name: str):
+        return self._noop
+
+    def start(self) -> None:
+        return None
+
+    async def stop(self) -> None:
+        return None
+
+
+NULL_PROFILER = NullProfiler()
+
+
+# profiler overhead hidden from tracemalloc reports: asyncio debug mode
+# captures a source traceback per task/handle (linecache, traceback)
+_OVERHEAD_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, traceback.__file__),
+    tracemalloc.Filter(False, asyncio.format_helpers.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+_TOOK_RE = re.compile(r"took ([0-9.]+) seconds")
+_CORO_RE = re.compile(r"coro=<([^\s(>]+)")
+
+
+class _AsyncioSlowCallbackHandler(logging.Handler):
+    """
+    Capture asyncio debug-mode 'Executing <Handle ...> took X seconds'
+    warnings and tag them with the blocking stage that took longest
+    inside that loop step.
+    """
+
+    def __init__(self, profiler: "RunProfiler"):
+        super().__init__(level=logging.WARNING)
+        self.profiler = profiler
+
+    def emit(self, record: logging.LogRecord) -> None:
+        msg = record.getMessage()
+        if not msg.startswith("Executing"):
+            return
+
+        # asyncio logs right after the step returns, so the step began
+        # `took` seconds ago; only stages that ended since then count
+        now = time.perf_counter()
+        m = _TOOK_RE.search(msg)
+        step_start = now - float(m.group(1)) if m else now
+
+        per_stage: dict[str, float] = {}
+        for name, end, elapsed in self.profiler.blocking_log:
+            if end >= step_start:
+                per_stage[name] = per_stage.get(name, 0.0) + elapsed
+        self.profiler.blocking_log.clear()
+
+        # first coro= is the one that ran (later ones are what it awaits)
+        coro = _CORO_RE.search(msg)
+
+        if per_stage:
+            tag = max(per_stage, key=per_stage.get)
+            breakdown = ", ".join(
+                f"{k}={v * 1000:.1f}ms" for k, v in per_stage.items()
+            )
+            msg = f"({breakdown}) {msg}"
+        elif coro and coro.group(1).endswith("_sample_memory"):
+            # our own tracemalloc sampling also blocks the loop
+            tag = "profiler"
+        else:
+            tag = "-"
+
+        self.profiler.slow_callbacks.append((tag, msg))
+
+
+class RunProfiler:
+    """
+    Profiling for a single `run`:
+
+    - cProfile/pstats dump of the whole run
+    - tracemalloc top-N snapshots every `mem_interval` seconds
+    - stages that blocked the event loop longer than `slow_ms`
+
+    Everything is tagged by pipeline stage (see STAGES).
+    """
+
+    enabled = True
+
+    def __init__(
+        self,
+        out_dir: str | Path,
+        *,
+        slow_ms: float = 100.0,
+        mem_interval: float = 5.0,
+        top_n: int = 20,
+    ):
+        self.out_dir = Path(out_dir)
+        self.slow_ms = slow_ms
+        self.mem_interval = mem_interval
+        self.top_n = top_n
+
+        # stage -> [count, total_s, max_s]
+        self.stage_stats: dict[str, list] = {}
+        self.active: dict[str, int] = {}
+
+        # recent (stage, end, elapsed) of blocking stages, consumed by
+        # the slow-callback handler to attribute each slow loop step
+        self.blocking_log: deque[tuple[str, float, float]] = deque(maxlen=4096)
+
+        self.slow_stages: list[tuple[str, float]] = []
+        self.slow_callbacks: list[tuple[str, str]] = []
+        self.mem_snapshots: list[tuple[float, dict, list]] = []
+
+        self._profile = cProfile.Profile()
+        self._mem_task: asyncio.Task | None = None
+        self._log_handler: logging.Handler | None = None
+        self._prev_debug = False
+        self._prev_slow_duration = 0.1
+        self._t0 = 0.0
+
+    # ---------- stages ----------
+
+    @contextmanager
+    def stage(self, name: str):
+        self.active[name] = self.active.get(name, 0) + 1
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            elapsed = end - t0
+            self.active[name] -= 1
+
+            stats = self.stage_stats.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+
+            if name in BLOCKING_STAGES:
+                self.blocking_log.append((name, end, elapsed))
+                if elapsed * 1000 >= self.slow_ms:
+                    self.slow_stages.append((name, elapsed))
+
+    # ---------- lifecycle ----------
+
+    def start(self) -> None:
+        """
+        Must be called from inside the running event loop.
+        """
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._t0 = time.perf_counter()
+
+        loop = asyncio.get_running_loop()
+        self._prev_debug = loop.get_debug()
+        self._prev_slow_duration = loop.slow_callback_duration
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_ms / 1000
+
+        self._log_handler = _AsyncioSlowCallbackHandler(self)
+        logging.getLogger("asyncio").addHandler(self._log_handler)
+
+        tracemalloc.start()
+        self._mem_task = asyncio.create_task(self._sample_memory())
+
+        self._profile.enable()
+
+    async def stop(self) -> None:
+        self._profile.disable()
+
+        if self._mem_task:
+            self._mem_task.cancel()
+            try:
+                await self._mem_task
+            except asyncio.CancelledError:
+                pass
+        self._take_snapshot()
+        tracemalloc.stop()
+
+        self._write_reports()
+
+        loop = asyncio.get_running_loop()
+        loop.set_debug(self._prev_debug)
+        loop.slow_callback_duration = self._prev_slow_duration
+
+        # asyncio reports the step running stop() only after it returns;
+        # detach on the next step so that report doesn't hit stderr
+        if self._log_handler:
+            loop.call_soon(
+                logging.getLogger("asyncio").removeHandler,
+                self._log_handler,
+            )
+
+    # ---------- memory ----------
+
+    async def _sample_memory(self) -> None:
+        while True:
+            await asyncio.sleep(self.mem_interval)
+            self._take_snapshot()
+
+    def _take_snapshot(self) -> None:
+        snapshot = tracemalloc.take_snapshot().filter_traces(_OVERHEAD_FILTERS)
+        top = snapshot.statistics("lineno")[: self.top_n]
+        active = {k: v for k, v in self.active.items() if v}
+        self.mem_snapshots.append(
+            (time.perf_counter() - self._t0, active, top)
+        )
+
+    # ---------- reports ----------
+
+    def _write_reports(self) -> None:
+        self._profile.dump_stats(self.out_dir / "run.pstats")
+
+        buf = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=buf)
+        stats.sort_stats("cumulative").print_stats(50)
+        (self.out_dir / "run_cumulative.txt").write_text(
+            buf.getvalue(), encoding="utf-8"
+        )
+
+        with (self.out_dir / "stages.txt").open("w", encoding="utf-8") as f:
+            f.write(f"{'stage':<24} {'count':>8} {'total_s':>10} {'max_ms':>10}\n")
+            for name in STAGES:
+                if name not in self.stage_stats:
+                    continue
+                count, total, mx = self.stage_stats[name]
+                f.write(
+                    f"{name:<24} {count:>8} {total:>10.3f} {mx * 1000:>10.1f}\n"
+                )
+
+        with (self.out_dir / "slow_callbacks.txt").open("w", encoding="utf-8") as f:
+            f.write(f"# threshold: {self.slow_ms} ms\n")
+            f.write("\n## blocking stages\n")
+            for name, elapsed in self.slow_stages:
+                f.write(f"[{name}] {elapsed * 1000:.1f} ms\n")
+            f.write("\n## asyncio slow callbacks\n")
+            for name, msg in self.slow_callbacks:
+                f.write(f"[{name}] {msg}\n")
+
+        with (self.out_dir / "tracemalloc.txt").open("w", encoding="utf-8") as f:
+            for ts, active, top in self.mem_snapshots:
+                tags = ", ".join(f"{k}={v}" for k, v in active.items()) or "-"
+                f.write(f"## t={ts:.1f}s active: {tags}\n")
+                for stat in top:
+                    f.write(f"{stat}\n")
+                f.write("\n")
@@ -0,0 +1,191 @@
+import heapq
+import json
+import os
+import tempfile
+from itertools import groupby
+from pathlib import Path
+
+
+COMPACT_POLICIES = ("confidence", "newest")
+
+# max runs merged at once (each is an open file); more runs are merged
+# in passes through intermediate runs
+MAX_MERGE_FAN_IN = 256
+
+
+def _rank(obj: dict, seq: int, policy: str) -> tuple:
+    """
+    Higher is better. `seq` (input order) breaks ties, so later lines win.
+    """
+    retrieved_at = obj.get("retrieved_at") or ""
+    if policy == "newest":
+        return (retrieved_at, seq)
+    return (obj.get("confidence") or 0.0, retrieved_at, seq)
+
+
+def _iter_records(paths: list[Path]):
+    """
+    Yield (village_code, seq, obj, line) from all inputs in order,
+    skipping blank / corrupted lines.
+    """
+    seq = 0
+    for path in paths:
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    obj = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                vc = obj.get("village_code")
+                if not vc:
+                    continue
+
+                yield vc, seq, obj, line
+                seq += 1
+
+
+def _write_run(tmp_dir: str, rows) -> Path:
+    """
+    Spill (village_code, seq, line) rows, already sorted by village_code.
+    """
+    fd, name = tempfile.mkstemp(dir=tmp_dir, suffix=".run")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for vc, seq, line in rows:
+            f.write(f"{vc}\t{seq}\t{line}\n")
+    return Path(name)
+
+
+def _spill(tmp_dir: str, best: dict[str, tuple]) -> Path:
+    return _write_run(
+        tmp_dir,
+        ((vc, best[vc][0], best[vc][2]) for vc in sorted(best)),
+    )
+
+
+def _read_run(path: Path):
+    with path.open("r", encoding="utf-8") as f:
+        for row in f:
+            vc, seq, line = row.rstrip("\n").split("\t", 2)
+            yield vc, int(seq), line
+
+
+def _merge_runs(runs: list[Path], policy: str):
+    """
+    k-way merge of sorted runs, yielding the best (village_code, seq, line)
+    per village.
+    """
+    merged = heapq.merge(*(_read_run(r) for r in runs))
+    for vc, group in groupby(merged, key=lambda t: t[0]):
+        _, seq, line = max(
+            (_rank(json.loads(line), seq, policy), seq, line)
+            for _, seq, line in group
+        )
+        yield vc, seq, line
+
+
+def _target_mode(path: Path) -> int:
+    """
+    Permissions for the compacted file: keep the existing output's mode,
+    otherwise what a plain open() would create under the current umask.
+    """
+    try:
+        return path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def compact_jsonl(
+    inputs: list[str | Path],
+    output: str | Path,
+    *,
+    policy: str = "confidence",
+    chunk_size: int = 100_000,
+    tmp_dir: str | None = None,
+    max_fan_in: int = MAX_MERGE_FAN_IN,
+) -> tuple[int, int]:
+    """
+    Merge JSONL outputs into one file with a single record per village_code.
+
+    External merge sort: at most `chunk_size` records are held in memory,
+    each chunk is deduplicated and spilled as a sorted run, then runs are
+    k-way merged, at most `max_fan_in` at a time. Output is sorted by village_code and replaced atomically,
+    so `output` may also be one of the inputs.
+
+    policy:
+    - confidence: highest confidence, then newest
+    - newest: latest retrieved_at, then last seen
+
+    Returns (records_read, records_written).
+    """
+    if policy not in COMPACT_POLICIES:
+        raise ValueError(f"Unknown compact policy: {policy}")
+
+    paths = [Path(p) for p in inputs]
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    read = 0
+    written = 0
+
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp:
+        runs: list[Path] = []
+        best: dict[str, tuple] = {}
+
+        # ---- phase 1: dedup chunks, spill sorted runs ----
+        for vc, seq, obj, line in _iter_records(paths):
+            read += 1
+            rank = _rank(obj, seq, policy)
+
+            current = best.get(vc)
+            if current is None or rank > current[1]:
+                best[vc] = (seq, rank, line)
+
+            if len(best) >= chunk_size:
+                runs.append(_spill(tmp, best))
+                best = {}
+
+        if best:
+            runs.append(_spill(tmp, best))
+            best = {}
+
+        # ---- phase 2: bounded fan-in passes over intermediate runs ----
+        while len(runs) > max_fan_in:
+            next_runs: list[Path] = []
+            for i in range(0, len(runs), max_fan_in):
+                group = runs[i:i + max_fan_in]
+                next_runs.append(_write_run(tmp, _merge_runs(group, policy)))
+                for r in group:
+                    r.unlink()
+            runs = next_runs
+
+        # ---- phase 3: final merge, keep best per village ----
+        fd, tmp_out = tempfile.mkstemp(
+            dir=output.parent,
+            prefix=f".{output.name}.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for _, _, line in _merge_runs(runs, policy):
+                    f.write(line + "\n")
+                    written += 1
+
+                f.flush()
+                os.fsync(f.fileno())
+
+            # mkstemp creates 0600; don't lock out other readers
+            os.chmod(tmp_out, _target_mode(output))
+
+            os.replace(tmp_out, output)
+        except BaseException:
+            if os.path.exists(tmp_out):
+                os.unlink(tmp_out)
+            raise
+
+    return read, written
@@ -1,17 +1,61 @@
 import json
 from pathlib import Path
-from dataclasses import asdict
+from typing import Callable
 
 from postal_code_id_ingester.model.augmented import AugmentedPostalCode
 
+try:
+    import orjson
+except ImportError:  # optional fast backend
+    orjson = None
+
+
+JSON_BACKENDS = ("auto", "json", "orjson")
+
+
+def get_json_encoder(backend: str = "auto") -> Callable[[dict], bytes]:
+    """
+    Return a dict -> UTF-8 line encoder for the given backend.
+
+    - auto: orjson if installed, otherwise stdlib json
+    - json: stdlib json
+    - orjson: orjson (raises if not installed)
+    """
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {backend}")
+
+    if backend == "orjson" and orjson is None:
+        raise RuntimeError("orjson backend requested but orjson is not installed")
+
+    if backend != "json" and orjson is not None:
+        def encode(obj: dict) -> bytes:
+            return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+        return encode
+
+    def encode(obj: dict) -> bytes:
+        return (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+
+    return encode
+
 
 def write_jsonl(
     path: str | Path,
     records: list[AugmentedPostalCode],
+    *,
+    json_backend: str = "auto",
 ) -> None:
+    """
+    Append records to a JSONL file.
+
+    Records without `retrieved_at` are stamped with a single timestamp
+    taken once for the whole batch.
+    """
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    with path.open("a", encoding="utf-8") as f:
-        for r in records:
-            f.write(json.dumps(asdict(r), ensure_ascii=False) + "\n")
+    encode = get_json_encoder(json_backend)
+    batch_ts = AugmentedPostalCode.now_iso()
+
+    with path.open("ab") as f:
+        f.writelines(encode(r.to_dict(batch_ts)) for r in records)
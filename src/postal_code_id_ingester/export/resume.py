@@ -24,3 +24,39 @@ def load_seen_village_codes(output_path: str) -> set[str]:
                 continue
 
     return seen
+
+
+def load_resolved_postal_codes(
+    output_path: str,
+    *,
+    exclude_sources: set[str] | None = None,
+) -> dict[str, str]:
+    """
+    village_code -> postal_code for records already in the output,
+    skipping any whose `source` is in `exclude_sources`.
+    """
+    path = Path(output_path)
+    resolved: dict[str, str] = {}
+
+    if not path.exists():
+        return resolved
+
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            if exclude_sources and obj.get("source") in exclude_sources:
+                continue
+
+            vc = obj.get("village_code")
+            pc = obj.get("postal_code")
+            if vc and pc:
+                resolved[vc] = pc
+
+    return resolved
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+
+# cached rows + the time (epoch seconds) they were fetched
+CachedCandidates = tuple[list[dict], float]
+
+
+class CandidateCache:
+    """
+    On-disk cache of parsed `parse_postal_results` rows keyed by
+    keyword + page.
+
+    - rows are stored as zlib-compressed JSON, not raw HTML
+    - entries older than `ttl` seconds are ignored and purged
+    - total stored bytes are capped at `max_bytes`, evicting least
+      recently used entries first
+    - backed by SQLite in WAL mode, so several shard processes on one
+      host can share a single cache file
+
+    All SQLite I/O runs on one dedicated thread with its own connection,
+    so a busy cache file (lock waits up to `timeout`) never blocks the
+    event loop. `get` / `put` / `close` are coroutines.
+
+    Hits don't write: last-access times are buffered and flushed in one
+    transaction every `touch_every` hits. Eviction runs every
+    `evict_every` writes and on close, so the cap can be briefly
+    exceeded by that many entries.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        ttl: float = 7 * 24 * 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+        timeout: float = 30.0,
+        evict_every: int = 256,
+        touch_every: int = 256,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.evict_every = evict_every
+        self.touch_every = touch_every
+
+        self.hits = 0
+        self.misses = 0
+
+        self._puts = 0
+        self._touched: dict[str, float] = {}
+
+        # sqlite connections are bound to the thread that created them
+        self._executor = ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix="candidate-cache",
+        )
+        self._conn: sqlite3.Connection | None = None
+        self._executor.submit(self._open).result()
+
+    @staticmethod
+    def make_key(keyword: str, start: int = 0, length: int = 25) -> str:
+        return f"{keyword}\x00{start}\x00{length}"
+
+    # ---------- async API ----------
+
+    async def get(
+        self,
+        keyword: str,
+        start: int = 0,
+        length: int = 25,
+    ) -> Optional[CachedCandidates]:
+        """
+        Return (rows, created_at) for a fresh entry, otherwise None.
+        """
+        return await self._run(self._get, self.make_key(keyword, start, length))
+
+    async def put(
+        self,
+        keyword: str,
+        candidates: list[dict],
+        start: int = 0,
+        length: int = 25,
+    ) -> None:
+        await self._run(
+            self._put,
+            self.make_key(keyword, start, length),
+            candidates,
+        )
+
+    async def close(self) -> None:
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    # ---------- cache thread ----------
+
+    def _open(self) -> None:
+        self._conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            isolation_level=None,  # autocommit; explicit BEGIN where needed
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS candidates (
+                key         TEXT PRIMARY KEY,
+                value       BLOB NOT NULL,
+                size        INTEGER NOT NULL,
+                created_at  REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_candidates_accessed "
+            "ON candidates (accessed_at)"
+        )
+
+    def _get(self, key: str) -> Optional[CachedCandidates]:
+        now = time.time()
+
+        row = self._conn.execute(
+            "SELECT value, created_at FROM candidates "
+            "WHERE key = ? AND created_at >= ?",
+            (key, now - self.ttl),
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touched[key] = now
+        if len(self._touched) >= self.touch_every:
+            self._flush_touched()
+
+        value, created_at = row
+        return json.loads(zlib.decompress(value)), created_at
+
+    def _put(self, key: str, candidates: list[dict]) -> None:
+        value = zlib.compress(
+            json.dumps(candidates, ensure_ascii=False).encode("utf-8")
+        )
+        now = time.time()
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO candidates "
+            "(key, value, size, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now, now),
+        )
+
+        self._puts += 1
+        if self._puts % self.evict_every == 0:
+            self._evict(now)
+
+    def _flush_touched(self) -> None:
+        if not self._touched:
+            return
+
+        touched = [(ts, key) for key, ts in self._touched.items()]
+        self._touched = {}
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "UPDATE candidates SET accessed_at = ? WHERE key = ?",
+                touched,
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, now: float) -> None:
+        self._flush_touched()
+
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(
+                "DELETE FROM candidates WHERE created_at < ?",
+                (now - self.ttl,),
+            )
+
+            (total,) = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM candidates"
+            ).fetchone()
+
+            if total > self.max_bytes:
+                excess = total - self.max_bytes
+                rows = self._conn.execute(
+                    "SELECT key, size FROM candidates ORDER BY accessed_at"
+                )
+                victims = []
+                for key, size in rows:
+                    if excess <= 0:
+                        break
+                    victims.append((key,))
+                    excess -= size
+
+                self._conn.executemany(
+                    "DELETE FROM candidates WHERE key = ?",
+                    victims,
+                )
+
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _close(self) -> None:
+        if self._puts:
+            self._evict(time.time())
+        else:
+            self._flush_touched()
+        self._conn.close()
@@ -7,6 +7,13 @@ from postal_code_id_ingester.policy.retry_policy import SimpleRetryPolicy
 POSTAL_ENDPOINT = "https://kodepos.posindonesia.co.id/CariKodepos"
 
 
+class FetchError(Exception):
+    """
+    Network / transport failure for a single keyword. Callers skip the
+    keyword; anything else (parsing, matching, worker pool) propagates.
+    """
+
+
 async def fetch_postal_html(
     keyword: str,
     start: int = 0,
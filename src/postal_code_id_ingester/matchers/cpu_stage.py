@@ -0,0 +1,156 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from postal_code_id_ingester.diagnostics.profiler import NULL_PROFILER
+from postal_code_id_ingester.matchers.region_matcher import (
+    match_postal_candidate,
+    match_postal_candidate_override,
+)
+from postal_code_id_ingester.model.village import VillageInput
+from postal_code_id_ingester.sources.pos_indonesia import parse_postal_page
+
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+@dataclass(frozen=True)
+class MatchRequest:
+    village: VillageInput
+    mode: str = "village"
+    postal_alias: Optional[str] = None
+    override: bool = False
+
+
+MatchResult = tuple[Optional[dict], Optional[float]]
+
+# parsed candidates (for caching; None when the page had no results
+# table, e.g. a ban or error page) + one MatchResult per request
+ParsedMatch = tuple[Optional[list[dict]], list[MatchResult]]
+
+
+def match_candidates(
+    candidates: list[dict],
+    requests: list[MatchRequest],
+) -> list[MatchResult]:
+    """
+    For each request return the first matching (candidate, score),
+    or (None, None).
+    """
+    results: list[MatchResult] = []
+
+    for req in requests:
+        found: MatchResult = (None, None)
+        for c in candidates:
+            if req.override:
+                score = match_postal_candidate_override(
+                    req.village,
+                    c,
+                    mode=req.mode,
+                    postal_alias=req.postal_alias,
+                )
+            else:
+                score = match_postal_candidate(req.village, c, mode=req.mode)
+
+            if score:
+                found = (c, score)
+                break
+        results.append(found)
+
+    return results
+
+
+def parse_and_match(
+    html: str,
+    requests: list[MatchRequest],
+) -> ParsedMatch:
+    """
+    Worker entry point: parse one result page and score it against a
+    batch of villages. Module-level so it pickles for process pools.
+    """
+    candidates, has_table = parse_postal_page(html)
+    return (
+        candidates if has_table else None,
+        match_candidates(candidates, requests),
+    )
+
+
+class CpuStage:
+    """
+    Runs HTML parsing + fuzzy scoring either inline on the event loop
+    (workers=0, default) or in a thread/process pool so network I/O keeps
+    flowing while CPU work spreads across cores.
+    """
+
+    def __init__(self, workers: int = 0, kind: str = "process"):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind}")
+
+        self.workers = workers
+        self.kind = kind
+        self._executor: Executor | None = None
+
+        if workers > 0:
+            if kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=workers)
+            else:
+                # spawn, not fork: by the first submit the process already
+                # has the event loop, HTTP transport threads and the cache
+                # connection, and forking a threaded process can deadlock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+
+    async def parse_and_match(
+        self,
+        html: str,
+        requests: list[MatchRequest],
+        profiler=NULL_PROFILER,
+    ) -> ParsedMatch:
+        if self._executor is None:
+            with profiler.stage("parse_postal_results"):
+                candidates, has_table = parse_postal_page(html)
+            with profiler.stage("region_matcher"):
+                return (
+                    candidates if has_table else None,
+                    match_candidates(candidates, requests),
+                )
+
+        loop = asyncio.get_running_loop()
+        with profiler.stage("cpu_worker"):
+            return await loop.run_in_executor(
+                self._executor,
+                parse_and_match,
+                html,
+                requests,
+            )
+
+    async def match(
+        self,
+        candidates: list[dict],
+        requests: list[MatchRequest],
+        profiler=NULL_PROFILER,
+    ) -> list[MatchResult]:
+        """
+        Score already-parsed candidates (e.g. from the candidate cache).
+        """
+        if self._executor is None:
+            with profiler.stage("region_matcher"):
+                return match_candidates(candidates, requests)
+
+        loop = asyncio.get_running_loop()
+        with profiler.stage("cpu_worker"):
+            return await loop.run_in_executor(
+                self._executor,
+                match_candidates,
+                candidates,
+                requests,
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
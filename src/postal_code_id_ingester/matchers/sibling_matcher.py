@@ -0,0 +1,83 @@
+from collections import defaultdict
+from typing import Iterable
+
+from postal_code_id_ingester.model.augmented import AugmentedPostalCode
+from postal_code_id_ingester.model.village import VillageInput
+
+
+SIBLING_SOURCE = "sibling-inference"
+
+# village codes are <district code><4-digit village part>
+VILLAGE_PART_LENGTH = 4
+
+
+def district_key(village_code: str) -> str:
+    """
+    District of a village, derived from its code so siblings can be
+    found among any resolved village, not just the ones loaded this run.
+    """
+    return village_code[:-VILLAGE_PART_LENGTH]
+
+
+def infer_from_siblings(
+    unresolved: Iterable[VillageInput],
+    resolved: dict[str, str],
+    *,
+    min_siblings: int = 2,
+    confidence: float = 0.5,
+    raw_level: str = "full",
+) -> list[AugmentedPostalCode]:
+    """
+    Propose postal codes for unresolved villages from already-resolved
+    siblings in the same district (no network requests).
+
+    A district is used only when it is unambiguous: at least
+    `min_siblings` resolved villages and all of them share one postal code.
+
+    `resolved` maps village_code -> postal_code and must only contain
+    real (fetched) matches, never earlier inferences. Siblings are
+    grouped by village_code prefix (see district_key).
+    """
+    codes_by_district: dict[str, set[str]] = defaultdict(set)
+    count_by_district: dict[str, int] = defaultdict(int)
+
+    for village_code, postal_code in resolved.items():
+        if not postal_code or len(village_code) <= VILLAGE_PART_LENGTH:
+            continue
+        district = district_key(village_code)
+        codes_by_district[district].add(postal_code)
+        count_by_district[district] += 1
+
+    records: list[AugmentedPostalCode] = []
+    for v in unresolved:
+        if v.village_code in resolved:
+            continue
+
+        district = district_key(v.village_code)
+        codes = codes_by_district.get(district)
+        if not codes or len(codes) != 1:
+            continue
+
+        siblings = count_by_district[district]
+        if siblings < min_siblings:
+            continue
+
+        postal_code = next(iter(codes))
+        records.append(
+            AugmentedPostalCode(
+                village_code=v.village_code,
+                postal_code=postal_code,
+                source=SIBLING_SOURCE,
+                confidence=confidence,
+                raw=AugmentedPostalCode.compact_raw(
+                    {
+                        "district": v.district,
+                        "district_code": v.district_code,
+                        "siblings": siblings,
+                    },
+                    raw_level,
+                ),
+            )
+        )
+
+    return records
@@ -1,17 +1,61 @@
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import Optional, Dict, Any
 from datetime import datetime, timezone
 
 
-@dataclass
+RAW_LEVELS = ("none", "minimal", "full")
+
+# candidate fields kept by --raw minimal (postal_code is already top-level)
+RAW_MINIMAL_FIELDS = ("village", "district")
+
+
+@dataclass(slots=True)
 class AugmentedPostalCode:
     village_code: str
     postal_code: str
     source: str
     confidence: float
-    retrieved_at: str
+    retrieved_at: Optional[str] = None
     raw: Optional[Dict[str, Any]] = None
 
     @staticmethod
     def now_iso() -> str:
         return datetime.now(timezone.utc).isoformat()
+
+    @staticmethod
+    def iso_from_timestamp(ts: float) -> str:
+        return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+    @staticmethod
+    def compact_raw(
+        candidate: Optional[Dict[str, Any]],
+        level: str = "full",
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Reduce a parsed candidate to the requested raw level.
+
+        - none: drop it entirely
+        - minimal: matched village / district names only
+        - full: keep the candidate as-is
+        """
+        if candidate is None or level == "none":
+            return None
+
+        if level == "minimal":
+            return {k: candidate[k] for k in RAW_MINIMAL_FIELDS if k in candidate}
+
+        return candidate
+
+    def to_dict(self, retrieved_at: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Plain dict for serialization (cheaper than dataclasses.asdict,
+        which deep-copies nested values).
+        """
+        return {
+            "village_code": self.village_code,
+            "postal_code": self.postal_code,
+            "source": self.source,
+            "confidence": self.confidence,
+            "retrieved_at": self.retrieved_at or retrieved_at,
+            "raw": self.raw,
+        }
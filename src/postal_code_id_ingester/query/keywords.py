@@ -1,4 +1,6 @@
 import re
+from functools import lru_cache
+from typing import Iterable, NamedTuple
 
 STOPWORDS = {
     "desa",
@@ -16,7 +18,26 @@ CITY_PREFIXES = {
     "city",
 }
 
+# distinct names per cache (villages ~84k, districts ~7k, regencies ~500);
+# bounded so long-running processes don't grow without limit
+KEYWORD_CACHE_SIZE = 131072
 
+MIN_KEYWORD_LENGTH = 3
+
+_NON_ALPHA = re.compile(r"[^a-zA-Z\s]")
+
+
+@lru_cache(maxsize=KEYWORD_CACHE_SIZE)
+def _tokens(name: str) -> tuple[str, ...]:
+    return tuple(_NON_ALPHA.sub(" ", name).split())
+
+
+@lru_cache(maxsize=KEYWORD_CACHE_SIZE)
+def _lower_tokens(name: str) -> tuple[str, ...]:
+    return tuple(_NON_ALPHA.sub(" ", name.lower()).split())
+
+
+@lru_cache(maxsize=KEYWORD_CACHE_SIZE)
 def extract_single_word(name: str) -> str:
     """
     Extract a single informative word from a place name.
@@ -25,8 +46,7 @@ def extract_single_word(name: str) -> str:
     if not name:
         return ""
 
-    cleaned = re.sub(r"[^a-zA-Z\s]", " ", name.lower())
-    tokens = [t for t in cleaned.split() if t and t not in STOPWORDS]
+    tokens = [t for t in _lower_tokens(name) if t not in STOPWORDS]
 
     if not tokens:
         return ""
@@ -34,6 +54,24 @@ def extract_single_word(name: str) -> str:
     return max(tokens, key=len)
 
 
+@lru_cache(maxsize=KEYWORD_CACHE_SIZE)
+def _prefix_keywords(
+    name: str,
+    min_words: int,
+    max_words: int,
+) -> tuple[str, ...]:
+    tokens = _tokens(name)
+
+    if len(tokens) < min_words:
+        return ()
+
+    # build in ascending length (2,3,4)
+    return tuple(
+        " ".join(tokens[:i])
+        for i in range(min_words, min(len(tokens), max_words) + 1)
+    )
+
+
 def extract_prefix_keywords(
     name: str,
     *,
@@ -47,25 +85,10 @@ def extract_prefix_keywords(
     if not name:
         return []
 
-    cleaned = re.sub(r"[^a-zA-Z\s]", " ", name)
-    tokens = [t for t in cleaned.split() if t]
-
-    if len(tokens) < min_words:
-        return []
-
-    prefixes = []
-    for i in range(min(len(tokens), max_words), min_words - 1, -1):
-        # build from shorter to longer but caller will dedup/order
-        pass
-
-    # build in ascending length (2,3,4)
-    prefixes = []
-    for i in range(min_words, min(len(tokens), max_words) + 1):
-        prefixes.append(" ".join(tokens[:i]))
-
-    return prefixes
+    return list(_prefix_keywords(name, min_words, max_words))
 
 
+@lru_cache(maxsize=KEYWORD_CACHE_SIZE)
 def normalize_city_name(name: str) -> str:
     """
     Remove administrative prefixes from city/regency names.
@@ -75,6 +98,77 @@ def normalize_city_name(name: str) -> str:
     if not name:
         return ""
 
-    cleaned = re.sub(r"[^a-zA-Z\s]", " ", name.lower())
-    parts = [p for p in cleaned.split() if p and p not in CITY_PREFIXES]
+    parts = [p for p in _lower_tokens(name) if p not in CITY_PREFIXES]
     return " ".join(parts).title()
+
+
+class KeywordLadder(NamedTuple):
+    keywords: tuple[str, ...]
+    city_keyword: str
+
+
+def build_keyword_ladder(v) -> KeywordLadder:
+    """
+    Ordered, deduplicated search keywords for a village
+    (anything with village / district / city attributes).
+
+    Keyword strategy (ORDER MATTERS):
+    1. village as-is
+    2. district as-is
+    3. progressive village prefixes
+    4. progressive district prefixes
+    5. single word from village
+    6. city-level LAST RESORT
+    """
+    return _keyword_ladder(v.village, v.district, v.city)
+
+
+@lru_cache(maxsize=KEYWORD_CACHE_SIZE)
+def _keyword_ladder(village: str, district: str, city: str) -> KeywordLadder:
+    city_keyword = normalize_city_name(city)
+
+    raw_keywords = [village, district]
+    raw_keywords.extend(extract_prefix_keywords(village))
+    raw_keywords.extend(extract_prefix_keywords(district))
+    raw_keywords.append(extract_single_word(village))
+    raw_keywords.append(city_keyword)
+
+    # ---- normalize & dedup ----
+    seen = set()
+    keywords = []
+    for k in raw_keywords:
+        if not k:
+            continue
+
+        k = k.strip()
+        if len(k) < MIN_KEYWORD_LENGTH:
+            continue
+
+        key = k.lower()
+        if key in seen:
+            continue
+
+        seen.add(key)
+        keywords.append(k)
+
+    return KeywordLadder(tuple(keywords), city_keyword)
+
+
+def build_keyword_ladders(villages: Iterable) -> list[KeywordLadder]:
+    """
+    Batch version of build_keyword_ladder; shared district / regency
+    names are tokenized only once across the batch.
+    """
+    return [build_keyword_ladder(v) for v in villages]
+
+
+def clear_keyword_cache() -> None:
+    for fn in (
+        _tokens,
+        _lower_tokens,
+        extract_single_word,
+        _prefix_keywords,
+        normalize_city_name,
+        _keyword_ladder,
+    ):
+        fn.cache_clear()
@@ -1,11 +1,17 @@
 from pyquery import PyQuery as pq
 
 
-def parse_postal_results(html: str) -> list[dict]:
+def parse_postal_page(html: str) -> tuple[list[dict], bool]:
+    """
+    Parse a result page. Also reports whether the `#list-data` results
+    table was present at all; ban / error / captcha pages lack it and
+    must not be mistaken for a genuine "no results".
+    """
     doc = pq(html)
+    table = doc("#list-data")
     results: list[dict] = []
 
-    for row in doc("#list-data tbody tr").items():
+    for row in table("tbody tr").items():
         cols = [c.text().strip() for c in row("td").items()]
 
         if len(cols) < 6:
@@ -19,4 +25,9 @@ def parse_postal_results(html: str) -> list[dict]:
             "province": cols[5],
         })
 
+    return results, bool(table)
+
+
+def parse_postal_results(html: str) -> list[dict]:
+    results, _ = parse_postal_page(html)
     return results